@@ -0,0 +1,75 @@
+import os
+import orjson
+from flask import Flask
+from flask.json.provider import JSONProvider
+from jinja2 import FileSystemBytecodeCache
+from flask_compress import Compress
+from . import config as settings
+from .models import db, upgrade_legacy_schema
+from .routes import bp
+
+class OrjsonProvider(JSONProvider):
+    """Route jsonify and request.get_json through orjson."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
+
+compress = Compress()
+
+def create_app(config=None):
+    """Create the quotation app; config overrides the settings taken from the environment."""
+    # templates/ and static/ live in the project root, next to app.py
+    app = Flask(__name__, root_path=settings.basedir)
+    app.json = OrjsonProvider(app)
+
+    # Create the instance directory if it doesn't exist
+    os.makedirs(settings.instance_path, exist_ok=True)
+
+    # Templates don't change on a deployed instance, so cache their compiled
+    # bytecode and skip the modification checks
+    if settings.serverless:
+        jinja_cache_path = os.path.join(settings.writable_dir, 'jinja_cache')
+        os.makedirs(jinja_cache_path, exist_ok=True)
+        app.jinja_env.bytecode_cache = FileSystemBytecodeCache(jinja_cache_path)
+        app.jinja_env.auto_reload = False
+
+    database_url = (config or {}).get('SQLALCHEMY_DATABASE_URI', settings.database_url)
+    app.config['SQLALCHEMY_DATABASE_URI'] = database_url
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    engine_options = {
+        'json_serializer': lambda obj: orjson.dumps(obj).decode(),
+        'json_deserializer': orjson.loads
+    }
+    if not database_url.startswith('sqlite'):
+        engine_options.update(pool_pre_ping=True, pool_size=5)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+    # Compress JSON and HTML responses; Vercel and Cloudflare already compress at
+    # the edge, so only do it when running outside of them
+    if not settings.serverless:
+        app.config['COMPRESS_MIMETYPES'] = ['application/json', 'text/html']
+        app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+        app.config['COMPRESS_LEVEL'] = 1
+        app.config['COMPRESS_BR_LEVEL'] = 1
+        app.config['COMPRESS_MIN_SIZE'] = 1024
+
+    if config:
+        app.config.update(config)
+
+    db.init_app(app)
+    if not settings.serverless:
+        compress.init_app(app)
+    app.register_blueprint(bp)
+
+    with app.app_context():
+        db.create_all()
+        upgrade_legacy_schema()
+
+    return app
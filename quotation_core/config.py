@@ -0,0 +1,23 @@
+import os
+
+# The project root, for reading non-writable files like templates and fonts
+basedir = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+
+# On serverless platforms like Vercel or Cloudflare Pages, use /tmp for writable files
+serverless = bool(os.environ.get('VERCEL') or os.environ.get('CF_PAGES'))
+if serverless:
+    writable_dir = '/tmp'
+else:
+    # For local development, use the project directory
+    writable_dir = basedir
+
+# The instance directory holds the SQLite database
+instance_path = os.path.join(writable_dir, 'instance')
+
+# Use DATABASE_URL from environment variables if set, otherwise use the writable path
+default_db_path = os.path.join(instance_path, 'quotations.db')
+database_url = os.environ.get('DATABASE_URL', f'sqlite:///{default_db_path}')
+
+# Vercel's Postgres uses postgres:// which SQLAlchemy needs as postgresql://
+if database_url and database_url.startswith("postgres://"):
+    database_url = database_url.replace("postgres://", "postgresql://", 1)
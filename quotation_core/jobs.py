@@ -0,0 +1,115 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import blake2b
+import orjson
+from .config import serverless
+from .xlsx import generate_excel
+
+# Generated Excel/PDF files are kept in memory, keyed by a hash of the
+# quotation content, so the preview -> download flow never touches the
+# filesystem and regenerating an unchanged quotation is a cache hit
+MAX_GENERATED_QUOTATIONS = 16
+generated_files = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Logs through the Flask app's logger, which is named after this package
+logger = logging.getLogger(__name__)
+
+# Shared across requests so generating files doesn't start new threads
+_GENERATION_POOL = ThreadPoolExecutor(max_workers=4)
+
+# File generation runs in the background so /create_files returns right away.
+# With REDIS_URL set, jobs go to an RQ queue served by `rq worker`; otherwise
+# they run on an in-process pool, which suits a single long-running server.
+# Serverless platforms freeze the instance once the response is sent, so
+# without a queue there the files are built before responding instead.
+redis_url = os.environ.get('REDIS_URL')
+if redis_url:
+    from redis import Redis
+    from rq import Queue
+    generation_queue = Queue(connection=Redis.from_url(redis_url))
+else:
+    generation_queue = None
+run_inline = serverless and generation_queue is None
+
+# RQ statuses of jobs that ended without producing files
+_RQ_FAILED_STATUSES = ('failed', 'stopped', 'canceled')
+_JOB_POOL = ThreadPoolExecutor(max_workers=2)
+# In-process jobs still running; a finished job moves its files to
+# generated_files, or its key to failed_jobs, whether or not anyone polls it
+pending_jobs = {}
+failed_jobs = OrderedDict()
+
+def build_files(args):
+    """Generate the Excel and PDF files of a quotation, keyed by filename."""
+    from .pdf import generate_pdf
+
+    quotation_no = args[4]
+    # The two files are independent, so build them side by side
+    excel_future = _GENERATION_POOL.submit(generate_excel, *args)
+    pdf_future = _GENERATION_POOL.submit(generate_pdf, *args)
+    return {f"Quotation_{quotation_no}.xlsx": excel_future.result(), f"Quotation_{quotation_no}.pdf": pdf_future.result()}
+
+def start_job(key, args):
+    # Jobs are identified by the content key, so resubmitting the same
+    # quotation while it is being generated doesn't start a second job
+    if generation_queue is not None:
+        job = generation_queue.fetch_job(key)
+        if job is None or job.get_status() in _RQ_FAILED_STATUSES:
+            generation_queue.enqueue(build_files, args, job_id=key)
+    elif key not in pending_jobs:
+        failed_jobs.pop(key, None)
+        future = pending_jobs[key] = _JOB_POOL.submit(build_files, args)
+        future.add_done_callback(lambda future: finish_job(key, future))
+
+def finish_job(key, future):
+    if future.exception() is not None:
+        logger.error('Generating files for %s failed', key, exc_info=future.exception())
+        with _cache_lock:
+            failed_jobs[key] = None
+            while len(failed_jobs) > MAX_GENERATED_QUOTATIONS:
+                failed_jobs.popitem(last=False)
+    else:
+        remember_files(key, future.result())
+    pending_jobs.pop(key, None)
+
+def job_state(key):
+    """Return the status of the job for key, caching its files once it has finished."""
+    if key in generated_files:
+        return 'finished'
+
+    if generation_queue is not None:
+        job = generation_queue.fetch_job(key)
+        if job is None:
+            return 'unknown'
+        status = job.get_status()
+        if status == 'finished':
+            remember_files(key, job.return_value())
+        elif status in _RQ_FAILED_STATUSES:
+            return 'failed'
+        return status.value
+
+    if key in pending_jobs:
+        return 'started'
+    # finish_job records the outcome before dropping the pending job, so a
+    # job that finished since the first check is found here
+    if key in generated_files:
+        return 'finished'
+    if key in failed_jobs:
+        return 'failed'
+    return 'unknown'
+
+def content_key(args):
+    return blake2b(orjson.dumps(args, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+
+def remember_files(key, files):
+    # Keep only the most recently generated quotations in memory. Jobs finish
+    # on worker threads, so updates take the cache lock.
+    with _cache_lock:
+        generated_files[key] = files
+        generated_files.move_to_end(key)
+        while len(generated_files) > MAX_GENERATED_QUOTATIONS:
+            generated_files.popitem(last=False)
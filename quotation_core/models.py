@@ -0,0 +1,140 @@
+import datetime
+import sqlite3
+from typing import Annotated
+from flask import current_app
+from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import Date, event, inspect, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine
+from pydantic import BaseModel, BeforeValidator
+
+db = SQLAlchemy()
+
+@event.listens_for(Engine, 'connect')
+def set_sqlite_pragma(dbapi_connection, connection_record):
+    # WAL with synchronous=NORMAL avoids an fsync on every commit
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute('PRAGMA journal_mode=WAL')
+        cursor.execute('PRAGMA synchronous=NORMAL')
+        cursor.execute('PRAGMA temp_store=MEMORY')
+        cursor.close()
+
+class Quotation(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    company_name = db.Column(db.String(100))
+    company_address = db.Column(db.String(200))
+    company_phone = db.Column(db.String(20))
+    company_email = db.Column(db.String(100))
+    client_name = db.Column(db.String(100))
+    client_address = db.Column(db.String(200))
+    # quotation_no names the generated files, so it has to be unique
+    quotation_no = db.Column(db.String(50), unique=True, index=True)
+    date = db.Column(db.Date)
+    items = db.Column(db.JSON().with_variant(JSONB(), 'postgresql'))
+    received = db.Column(db.Float)
+    deposit_info = db.Column(db.Text)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'company_name': self.company_name,
+            'company_address': self.company_address,
+            'company_phone': self.company_phone,
+            'company_email': self.company_email,
+            'client_name': self.client_name,
+            'client_address': self.client_address,
+            'quotation_no': self.quotation_no,
+            'date': self.date,
+            'items': self.items,
+            'received': self.received,
+            'deposit_info': self.deposit_info
+        }
+
+# Index for the listing order. SQLite already sorts NULL dates last on a
+# descending index and rejects NULLS LAST in index definitions; Postgres
+# needs it spelled out
+db.Index('ix_quotation_date', Quotation.date.desc(), Quotation.id.desc()).ddl_if(dialect='sqlite')
+db.Index('ix_quotation_date_nulls_last', Quotation.date.desc().nulls_last(), Quotation.id.desc()).ddl_if(dialect='postgresql')
+db.Index('ix_quotation_items', Quotation.items, postgresql_using='gin').ddl_if(dialect='postgresql')
+
+def upgrade_legacy_schema():
+    """Bring a quotation table created by an older version up to date.
+
+    create_all() never alters an existing table. Older versions stored the
+    form's date value as text, with '' for a cleared date or number, and had
+    no indexes. This converts those dates to ISO dates, or NULL when they
+    aren't one, turns blank quotation numbers into NULL and creates the
+    missing indexes. The unique quotation_no index is created last, so once
+    it exists the table is up to date and this returns straight away.
+    """
+    table = Quotation.__table__
+    unique_index = next(index for index in table.indexes if index.unique)
+    inspector = inspect(db.engine)
+    if any(index['name'] == unique_index.name for index in inspector.get_indexes(table.name)):
+        return
+
+    columns = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+    if db.engine.dialect.name == 'sqlite':
+        # SQLite keeps the column's declared type, so only the values change;
+        # date() gives the ISO form of a date string and NULL for anything else
+        db.session.execute(text('UPDATE quotation SET date = date(date) WHERE date IS NOT date(date)'))
+    elif not isinstance(columns['date'], Date):
+        db.session.execute(text(
+            "ALTER TABLE quotation ALTER COLUMN date TYPE date "
+            "USING CASE WHEN date ~ '^\\d{4}-\\d{2}-\\d{2}$' THEN date::date END"
+        ))
+    db.session.execute(text("UPDATE quotation SET quotation_no = NULL WHERE quotation_no = ''"))
+    db.session.commit()
+
+    for index in table.indexes - {unique_index}:
+        index.create(db.engine, checkfirst=True)
+
+    duplicates = db.session.execute(
+        db.select(Quotation.quotation_no)
+        .where(Quotation.quotation_no.is_not(None))
+        .group_by(Quotation.quotation_no)
+        .having(db.func.count() > 1)
+    ).scalars().all()
+    if duplicates:
+        # Saving still works, but duplicates aren't rejected until these are renumbered
+        current_app.logger.error(
+            'Not creating the unique index %s: quotation numbers %s are used more than once. '
+            'Renumber or delete the extra quotations and restart.',
+            unique_index.name, ', '.join(duplicates)
+        )
+        return
+    unique_index.create(db.engine)
+
+# Request bodies of /api/save_quotation. The form posts every value as a
+# string, with '' for fields left empty
+def _blank_to_none(value):
+    return None if value == '' else value
+
+OptionalInt = Annotated[int | None, BeforeValidator(_blank_to_none)]
+OptionalFloat = Annotated[float | None, BeforeValidator(_blank_to_none)]
+OptionalStr = Annotated[str | None, BeforeValidator(_blank_to_none)]
+OptionalDate = Annotated[datetime.date | None, BeforeValidator(_blank_to_none)]
+
+class ItemIn(BaseModel):
+    name: str | None = None
+    quantity: OptionalFloat = None
+    price: OptionalFloat = None
+
+class QuotationIn(BaseModel):
+    id: OptionalInt = None
+    company_name: str | None = None
+    company_address: str | None = None
+    company_phone: str | None = None
+    company_email: str | None = None
+    client_name: str | None = None
+    client_address: str | None = None
+    quotation_no: OptionalStr = None
+    date: OptionalDate = None
+    received: OptionalFloat = None
+    deposit_info: str | None = None
+    items: list[ItemIn] = []
+
+# Columns returned by the quotation listing
+LIST_COLUMNS = (Quotation.id, Quotation.quotation_no, Quotation.date, Quotation.client_name, Quotation.received)
+QUOTATIONS_PAGE_SIZE = 50
@@ -0,0 +1,150 @@
+# ReportLab and the SimSun font take a while to load, so this module is only
+# imported by the first file generation, not when the app starts.
+import os
+from io import BytesIO
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfbase import pdfmetrics
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import Paragraph
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib import colors
+from reportlab.lib.units import cm, inch
+from .config import basedir
+
+# Register Chinese font
+# The font is expected to be in the 'static' directory relative to the project root.
+# A deploy can ship a smaller subset of it instead, built with:
+#   pyftsubset static/SimSun.ttf --output-file=static/SimSun-subset.ttf \
+#     --unicodes=U+0020-007E,U+00A0-00FF,U+2000-206F,U+3000-303F,U+4E00-9FFF,U+FF00-FFEF
+# pdfmetrics keeps registered fonts for the life of the process, so a re-import
+# of this module reuses the already parsed font.
+if 'SimSun' not in pdfmetrics.getRegisteredFontNames():
+    font_path = os.path.join(basedir, 'static', 'SimSun-subset.ttf')
+    if not os.path.exists(font_path):
+        font_path = os.path.join(basedir, 'static', 'SimSun.ttf')
+    pdfmetrics.registerFont(TTFont('SimSun', font_path))
+    pdfmetrics.registerFontFamily('SimSun', normal='SimSun', bold='SimSun', italic='SimSun', boldItalic='SimSun')
+
+# PDF styles, built once at import rather than on every request
+_STYLES = getSampleStyleSheet()
+_STYLES.add(ParagraphStyle(name='SimSun', fontName='SimSun', fontSize=10, leading=14))
+_STYLES.add(ParagraphStyle(name='SimSunBold', fontName='SimSun', fontSize=12, leading=14, alignment=1))
+_STYLES.add(ParagraphStyle(name='SimSunTitle', fontName='SimSun', fontSize=16, leading=20, alignment=1))
+_SIMSUN = _STYLES['SimSun']
+_SIMSUN_BOLD = _STYLES['SimSunBold']
+_SIMSUN_TITLE = _STYLES['SimSunTitle']
+
+# PDF layout, matching A4 with SimpleDocTemplate's default one inch margins
+# and frame padding
+_PAGE_WIDTH, _PAGE_HEIGHT = A4
+_PAGE_MARGIN = inch + 6
+_ROW_HEIGHT = 18
+_ROW_BASELINE = 6
+_CELL_PADDING = 6
+_CLIENT_COL_WIDTHS = (10*cm, 6*cm)
+_ITEM_COL_WIDTHS = (8*cm, 2*cm, 3*cm, 3*cm)
+_ITEM_ALIGNS = ('CENTER', 'CENTER', 'CENTER', 'CENTER')
+_FRAME_WIDTH = _PAGE_WIDTH - 2 * _PAGE_MARGIN
+
+def _pdf_centred(c, text, style, y):
+    """Draw one centred line in the given paragraph style, returning the y below it."""
+    c.setFont('SimSun', style.fontSize)
+    c.drawCentredString(_PAGE_WIDTH / 2, y - style.fontSize, text)
+    return y - style.leading
+
+def _pdf_paragraph(c, text, style, y):
+    """Draw text wrapped to the frame width with its top at y, returning the y below it."""
+    paragraph = Paragraph(text, style)
+    _, height = paragraph.wrapOn(c, _FRAME_WIDTH, y - _PAGE_MARGIN)
+    paragraph.drawOn(c, _PAGE_MARGIN, y - height)
+    return y - height
+
+def _pdf_row(c, x, y, widths, values, aligns, fill=None, text_color=colors.black):
+    """Draw one gridded table row with its top edge at y, returning the y of its bottom edge."""
+    bottom = y - _ROW_HEIGHT
+    if fill is not None:
+        c.setFillColor(fill)
+        c.rect(x, bottom, sum(widths), _ROW_HEIGHT, stroke=0, fill=1)
+    c.setFillColor(text_color)
+    c.setFont('SimSun', 10)
+    baseline = bottom + _ROW_BASELINE
+    for width, value, align in zip(widths, values, aligns):
+        if align == 'LEFT':
+            c.drawString(x + _CELL_PADDING, baseline, value)
+        elif align == 'RIGHT':
+            c.drawRightString(x + width - _CELL_PADDING, baseline, value)
+        else:
+            c.drawCentredString(x + width / 2, baseline, value)
+        c.rect(x, bottom, width, _ROW_HEIGHT)
+        x += width
+    return bottom
+
+def generate_pdf(company_name, company_address, company_phone, company_email, quotation_no, date, client_name, client_address, items, total_amount, received, balance, deposit_info):
+    # The layout is fixed, so rows are drawn straight onto the canvas rather
+    # than going through Platypus table layout
+    buf = BytesIO()
+    c = canvas.Canvas(buf, pagesize=A4)
+    c.setLineWidth(1)
+    left = (_PAGE_WIDTH - sum(_ITEM_COL_WIDTHS)) / 2
+    top = _PAGE_HEIGHT - _PAGE_MARGIN
+
+    def new_page():
+        c.showPage()
+        c.setLineWidth(1)
+        return top
+
+    # Company Info
+    # These can be longer than a line, so they wrap like the deposit paragraph
+    y = _pdf_paragraph(c, company_name, _SIMSUN_TITLE, top)
+    y = _pdf_paragraph(c, company_address, _SIMSUN_BOLD, y)
+    y = _pdf_paragraph(c, f"Tel: {company_phone} Email: {company_email}", _SIMSUN_BOLD, y)
+    y -= 0.5*cm
+    y = _pdf_centred(c, "報價單", _SIMSUN_TITLE, y)
+    y -= 1*cm
+
+    # Client Info
+    y = _pdf_row(c, left, y, _CLIENT_COL_WIDTHS, [f"客戶名稱: {client_name}", f"報價單號碼: {quotation_no}"], ('LEFT', 'LEFT'))
+    y = _pdf_row(c, left, y, _CLIENT_COL_WIDTHS, [f"客戶地址: {client_address}", f"日期: {date}"], ('LEFT', 'LEFT'))
+    y -= 1*cm
+
+    # Items Table
+    # Quantities and amounts are formatted the same way as the preview page,
+    # which prints the quantity as is
+    headers = ["項目", "數量", "單價", "金額"]
+    y = _pdf_row(c, left, y, _ITEM_COL_WIDTHS, headers, _ITEM_ALIGNS, fill=colors.grey, text_color=colors.whitesmoke)
+    for item in items:
+        if y - _ROW_HEIGHT < _PAGE_MARGIN:
+            y = new_page()
+            y = _pdf_row(c, left, y, _ITEM_COL_WIDTHS, headers, _ITEM_ALIGNS, fill=colors.grey, text_color=colors.whitesmoke)
+        values = [item['name'], str(item['quantity']), f"{item['price']:,.2f}", f"{item['amount']:,.2f}"]
+        y = _pdf_row(c, left, y, _ITEM_COL_WIDTHS, values, _ITEM_ALIGNS)
+
+    # Total
+    if y - 3 * _ROW_HEIGHT < _PAGE_MARGIN:
+        y = new_page()
+    total_left = left + sum(_ITEM_COL_WIDTHS[:2])
+    for label, value in (("總計:", total_amount), ("已收訂金:", received), ("餘額:", balance)):
+        y = _pdf_row(c, total_left, y, _ITEM_COL_WIDTHS[2:], [label, f"{value:,.2f}"], ('RIGHT', 'CENTER'))
+    y -= 1*cm
+
+    # Deposit Info
+    # Deposit details can run to several lines, so this is the one wrapped
+    # paragraph; it is split across pages when it doesn't fit
+    deposit = Paragraph(f"訂金資訊: {deposit_info}", _SIMSUN)
+    while True:
+        available = y - _PAGE_MARGIN
+        _, height = deposit.wrapOn(c, _FRAME_WIDTH, available)
+        if height <= available:
+            deposit.drawOn(c, _PAGE_MARGIN, y - height)
+            break
+        # split() returns no pieces when not even one line fits
+        pieces = deposit.split(_FRAME_WIDTH, available)
+        if len(pieces) == 2:
+            piece, deposit = pieces
+            _, height = piece.wrapOn(c, _FRAME_WIDTH, available)
+            piece.drawOn(c, _PAGE_MARGIN, y - height)
+        y = new_page()
+
+    c.save()
+    return buf.getvalue()
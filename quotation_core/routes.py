@@ -0,0 +1,215 @@
+import datetime
+import math
+import os
+from io import BytesIO
+from flask import Blueprint, abort, current_app, render_template, request, send_file, jsonify, stream_with_context, url_for
+from sqlalchemy import insert, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from pydantic import ValidationError
+from .jobs import build_files, content_key, generated_files, job_state, remember_files, run_inline, start_job
+from .models import db, LIST_COLUMNS, QUOTATIONS_PAGE_SIZE, Quotation, QuotationIn
+
+bp = Blueprint('quotation', __name__)
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+@bp.route('/')
+def index():
+    if current_app.debug:
+        return render_template('index.html')
+    # index.html takes no variables, so each app only needs to render it once
+    page = current_app.extensions.get('quotation_index')
+    if page is None:
+        page = current_app.extensions['quotation_index'] = render_template('index.html')
+    return page
+
+@bp.route('/api/quotations')
+def get_quotations():
+    # Keyset pagination: the client passes back the (date, id) of the last
+    # row it received as the cursor for the next page. Quotations without a
+    # date sort last, and their cursor has no before_date.
+    before_date = request.args.get('before_date')
+    if before_date is not None:
+        try:
+            before_date = datetime.date.fromisoformat(before_date)
+        except ValueError:
+            return jsonify({'error': 'Invalid before_date'}), 400
+    before_id = request.args.get('before_id', type=int)
+
+    # Dated quotations first, then the ones without a date; each phase is a
+    # single range scan of the listing index. NULLS LAST is redundant next to
+    # the IS NOT NULL filter but lets Postgres match its index order.
+    rows = []
+    if before_id is None or before_date is not None:
+        query = list_query().filter(Quotation.date.is_not(None))
+        if before_id is not None:
+            query = query.filter(tuple_(Quotation.date, Quotation.id) < (before_date, before_id))
+        rows = query.order_by(Quotation.date.desc().nulls_last(), Quotation.id.desc()).limit(QUOTATIONS_PAGE_SIZE).all()
+    if len(rows) < QUOTATIONS_PAGE_SIZE:
+        query = list_query().filter(Quotation.date.is_(None))
+        if before_id is not None and before_date is None:
+            query = query.filter(Quotation.id < before_id)
+        rows += query.order_by(Quotation.id.desc()).limit(QUOTATIONS_PAGE_SIZE - len(rows)).all()
+
+    next_cursor = None
+    if len(rows) == QUOTATIONS_PAGE_SIZE:
+        next_cursor = {'before_id': rows[-1].id}
+        if rows[-1].date is not None:
+            next_cursor['before_date'] = rows[-1].date.isoformat()
+
+    return jsonify({'quotations': [row._asdict() for row in rows], 'next_cursor': next_cursor})
+
+def list_query():
+    # Only the columns the drafts list shows; the full row, including the
+    # items JSON, is fetched through /api/get_quotation/<id>
+    return db.session.query(*LIST_COLUMNS)
+
+@bp.route('/api/save_quotation', methods=['POST'])
+def save_quotation():
+    # Parse and validate the raw body in one pass
+    try:
+        quotation_in = QuotationIn.model_validate_json(request.get_data(cache=False))
+    except ValidationError as e:
+        errors = e.errors(include_url=False, include_context=False, include_input=False)
+        return jsonify({'success': False, 'message': 'Invalid quotation data', 'errors': errors}), 400
+
+    quotation_id = quotation_in.id
+    fields = quotation_in.model_dump(exclude={'id'})
+
+    # Single INSERT/UPDATE ... RETURNING statements, bypassing the unit of work
+    try:
+        if quotation_id:
+            # Update existing quotation
+            stmt = update(Quotation).where(Quotation.id == quotation_id).values(**fields).returning(Quotation.id)
+            quotation_id = db.session.execute(stmt).scalar_one_or_none()
+            if quotation_id is None:
+                return jsonify({'success': False, 'message': 'Quotation not found'}), 404
+        else:
+            # Create new quotation
+            stmt = insert(Quotation).values(**fields).returning(Quotation.id)
+            quotation_id = db.session.execute(stmt).scalar_one()
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'success': False, 'message': 'Quotation number already exists'}), 409
+    return jsonify({'success': True, 'id': quotation_id, 'message': 'Quotation saved successfully'})
+
+@bp.route('/api/get_quotation/<int:id>')
+def get_quotation(id):
+    quotation = db.session.get(Quotation, id)
+    if quotation:
+        return jsonify(quotation.to_dict())
+    return jsonify({'error': 'Quotation not found'}), 404
+
+@bp.route('/api/delete_quotation/<int:id>', methods=['DELETE'])
+def delete_quotation(id):
+    quotation = db.session.get(Quotation, id)
+    if quotation:
+        db.session.delete(quotation)
+        db.session.commit()
+        return jsonify({'success': True})
+    return jsonify({'error': 'Quotation not found'}), 404
+
+
+def parse_items(form):
+    """Return the items of a quotation form, skipping rows without a name, and their total."""
+    rows = [
+        (name, float(quantity), float(price))
+        for name, quantity, price in zip(form.getlist('item_name[]'), form.getlist('quantity[]'), form.getlist('price[]'))
+        if name
+    ]
+    items = [
+        {'name': name, 'quantity': quantity, 'price': price, 'amount': quantity * price}
+        for name, quantity, price in rows
+    ]
+    # fsum keeps the total (and the balance derived from it) free of rounding
+    # drift on long quotations
+    return items, math.fsum(item['amount'] for item in items)
+
+@bp.route('/generate', methods=['POST'])
+def generate():
+    # Collect data from form
+    data = {
+        'company_name': request.form['company_name'],
+        'company_address': request.form['company_address'],
+        'company_phone': request.form['company_phone'],
+        'company_email': request.form['company_email'],
+        'quotation_no': request.form['quotation_no'],
+        'date': request.form['date'],
+        'client_name': request.form['client_name'],
+        'client_address': request.form['client_address'],
+        'received': float(request.form.get('received', '0') or '0'),
+        'deposit_info': request.form.get('deposit_info', '')
+    }
+
+    items, total_amount = parse_items(request.form)
+
+    data['total_amount'] = total_amount
+    data['balance'] = total_amount - data['received']
+
+    return render_template('preview.html', data=data, items=items)
+
+@bp.route('/create_files', methods=['POST'])
+def create_files():
+    # Get data from hidden fields
+    company_name = request.form['company_name']
+    company_address = request.form['company_address']
+    company_phone = request.form['company_phone']
+    company_email = request.form['company_email']
+    quotation_no = request.form['quotation_no']
+    date = request.form['date']
+    client_name = request.form['client_name']
+    client_address = request.form['client_address']
+    received = float(request.form.get('received', '0') or '0')
+    deposit_info = request.form.get('deposit_info', '')
+
+    items, total_amount = parse_items(request.form)
+    balance = total_amount - received
+
+    excel_filename = f"Quotation_{quotation_no}.xlsx"
+    pdf_filename = f"Quotation_{quotation_no}.pdf"
+    args = (company_name, company_address, company_phone, company_email, quotation_no, date, client_name, client_address, items, total_amount, received, balance, deposit_info)
+    key = content_key(args)
+
+    # Generate Excel and PDF in the background, unless this exact quotation
+    # was generated already; the result page polls /status/<key>
+    files = generated_files.get(key)
+    if files is None and run_inline:
+        files = build_files(args)
+    if files is None:
+        start_job(key, args)
+    else:
+        remember_files(key, files)
+
+    return render_template('result.html', key=key, ready=files is not None, excel_file=excel_filename, pdf_file=pdf_filename)
+
+@bp.route('/status/<key>')
+def job_status(key):
+    status = job_state(key)
+    # The files may have been evicted from the cache since the job finished
+    files = generated_files.get(key) if status == 'finished' else None
+    if files is None:
+        return jsonify({'status': 'unknown' if status == 'finished' else status})
+    files = {
+        filename: url_for('.download_generated_file', key=key, filename=filename)
+        for filename in files
+    }
+    return jsonify({'status': status, 'files': files})
+
+@bp.route('/download/<key>/<filename>')
+def download_generated_file(key, filename):
+    data = generated_files.get(key, {}).get(filename)
+    if data is None:
+        abort(404)
+    extension = os.path.splitext(filename)[1]
+    response = send_file(BytesIO(data), as_attachment=True, download_name=filename, etag=key + extension)
+    if response.status_code == 200:
+        # send_file iterates the buffer in 8 KB blocks; hand the body to the
+        # server in larger chunks instead, keeping its headers
+        response.response = stream_with_context(iter_chunks(data))
+        response.direct_passthrough = False
+    return response
+
+def iter_chunks(data):
+    for start in range(0, len(data), DOWNLOAD_CHUNK_SIZE):
+        yield data[start:start + DOWNLOAD_CHUNK_SIZE]
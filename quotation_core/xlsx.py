@@ -0,0 +1,173 @@
+import re
+import zipfile
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+# Excel workbook parts. The quotation sheet has a fixed layout, so the XLSX
+# container is written directly instead of going through openpyxl; only the
+# worksheet XML changes from one quotation to the next.
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+    '</Types>'
+)
+_XLSX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Quotation" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>'
+    '</Relationships>'
+)
+# Fonts: regular, bold, 16pt bold title, 14pt bold heading. The header fill is
+# the same beige as the preview page, given as a full ARGB value.
+_XLSX_STYLES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    '<numFmts count="1"><numFmt numFmtId="164" formatCode="#,##0.00"/></numFmts>'
+    '<fonts count="4">'
+    '<font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="16"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="14"/><name val="Calibri"/></font>'
+    '</fonts>'
+    '<fills count="3">'
+    '<fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill>'
+    '<fill><patternFill patternType="solid"><fgColor rgb="FFF5F0E8"/><bgColor rgb="FFF5F0E8"/></patternFill></fill>'
+    '</fills>'
+    '<borders count="2">'
+    '<border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border>'
+    '</borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="9">'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="2" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="0" fontId="3" fillId="0" borderId="0" xfId="0" applyFont="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="0" fontId="1" fillId="2" borderId="1" xfId="0" applyFont="1" applyFill="1" applyBorder="1" applyAlignment="1"><alignment horizontal="center" vertical="center"/></xf>'
+    '<xf numFmtId="0" fontId="0" fillId="0" borderId="1" xfId="0" applyBorder="1"/>'
+    '<xf numFmtId="164" fontId="0" fillId="0" borderId="1" xfId="0" applyNumberFormat="1" applyBorder="1"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1"/>'
+    '<xf numFmtId="164" fontId="1" fillId="0" borderId="1" xfId="0" applyNumberFormat="1" applyFont="1" applyBorder="1"/>'
+    '</cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+_XLSX_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+# Indexes into cellXfs above
+_XF_DEFAULT = 0
+_XF_TITLE = 1
+_XF_CENTER = 2
+_XF_HEADING = 3
+_XF_HEADER = 4
+_XF_CELL = 5
+_XF_MONEY = 6
+_XF_BOLD = 7
+_XF_BOLD_MONEY = 8
+
+# The quotation sheet never goes past column E
+_XLSX_COLUMNS = 'ABCDE'
+
+# Control characters that are not allowed anywhere in XML 1.0
+_ILLEGAL_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+def _xlsx_cell(ref, value, style):
+    if value is None:
+        return f'<c r="{ref}" s="{style}"/>'
+    if isinstance(value, str):
+        text = escape(_ILLEGAL_XML_CHARS.sub('', value))
+        return f'<c r="{ref}" s="{style}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+    return f'<c r="{ref}" s="{style}"><v>{value!r}</v></c>'
+
+def build_xlsx(rows, merges=()):
+    """Return a one-sheet XLSX workbook as bytes.
+
+    rows is a list of rows, each a list of (value, style) cells starting at
+    column A, with None for a cell that is left out; style is one of the
+    _XF_* indexes.
+    """
+    sheet = [_XLSX_SHEET_HEAD]
+    for row_number, row in enumerate(rows, 1):
+        cells = ''.join(
+            _xlsx_cell(f'{_XLSX_COLUMNS[column]}{row_number}', *cell)
+            for column, cell in enumerate(row)
+            if cell is not None
+        )
+        sheet.append(f'<row r="{row_number}">{cells}</row>')
+    sheet.append('</sheetData>')
+    if merges:
+        sheet.append(f'<mergeCells count="{len(merges)}">')
+        sheet.extend(f'<mergeCell ref="{ref}"/>' for ref in merges)
+        sheet.append('</mergeCells>')
+    sheet.append('</worksheet>')
+
+    buf = BytesIO()
+    with zipfile.ZipFile(buf, 'w', compression=zipfile.ZIP_DEFLATED, compresslevel=1) as xlsx:
+        xlsx.writestr('[Content_Types].xml', _XLSX_CONTENT_TYPES)
+        xlsx.writestr('_rels/.rels', _XLSX_RELS)
+        xlsx.writestr('xl/workbook.xml', _XLSX_WORKBOOK)
+        xlsx.writestr('xl/_rels/workbook.xml.rels', _XLSX_WORKBOOK_RELS)
+        xlsx.writestr('xl/styles.xml', _XLSX_STYLES)
+        xlsx.writestr('xl/worksheets/sheet1.xml', ''.join(sheet))
+    return buf.getvalue()
+
+def generate_excel(company_name, company_address, company_phone, company_email, quotation_no, date, client_name, client_address, items, total_amount, received, balance, deposit_info):
+    rows = [
+        # Company Info
+        [(company_name, _XF_TITLE)],
+        [(company_address, _XF_CENTER)],
+        [(f"Tel: {company_phone} Email: {company_email}", _XF_CENTER)],
+
+        # Quotation Title
+        [("報價單", _XF_HEADING)],
+        [],
+
+        # Client Info
+        [("客戶名稱:", _XF_DEFAULT), (client_name, _XF_DEFAULT), None, ("報價單號碼:", _XF_DEFAULT), (quotation_no, _XF_DEFAULT)],
+        [("客戶地址:", _XF_DEFAULT), (client_address, _XF_DEFAULT), None, ("日期:", _XF_DEFAULT), (date, _XF_DEFAULT)],
+        [],
+
+        # Table Header
+        [(header, _XF_HEADER) for header in ["項目", "數量", "單價", "金額"]],
+    ]
+
+    # Items
+    rows.extend(
+        [(item['name'], _XF_CELL), (item['quantity'], _XF_CELL), (item['price'], _XF_MONEY), (item['amount'], _XF_MONEY)]
+        for item in items
+    )
+
+    # Total
+    rows.extend(
+        [None, None, (label, _XF_BOLD), (value, _XF_BOLD_MONEY)]
+        for label, value in (("總計:", total_amount), ("已收訂金:", received), ("餘額:", balance))
+    )
+
+    # Deposit Info
+    rows.append([])
+    rows.append([(f"訂金資訊: {deposit_info}", _XF_DEFAULT)])
+
+    return build_xlsx(rows, merges=('A1:E1', 'A2:E2', 'A3:E3', 'A4:E4'))